@@ -1,4 +1,6 @@
-from audioop import reverse
+import mmap
+from operator import itemgetter
+from pathlib import Path
 import re
 import string
 
@@ -27,6 +29,41 @@ def part_one(keys: list[str]) -> int:
     return out
 
 
+# everything but digits and newlines, for bytes.translate to delete
+NON_DIGITS = bytes(b for b in range(256) if b not in b"0123456789\n")
+
+
+def sum_digit_lines(digits: bytes) -> int:
+    # digits holds only digits and newlines, so each line's first and last
+    # bytes are its first and last digits
+    lines = list(filter(None, digits.split(b"\n")))
+    firsts = sum(map(itemgetter(0), lines))
+    lasts = sum(map(itemgetter(-1), lines))
+
+    # undo the ascii offset of 48 on both digits of every line
+    return 10 * firsts + lasts - 11 * 48 * len(lines)
+
+
+def part_one_file(fp: str, chunk_size: int = 1 << 24) -> int:
+    fp = Path(fp)
+    if fp.stat().st_size == 0:
+        return 0
+
+    out = 0
+    with fp.open("rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = 0
+            while start < len(data):
+                # cut chunks on line boundaries
+                end = data.find(b"\n", start + chunk_size)
+                end = len(data) if end == -1 else end + 1
+                chunk = data[start:end].translate(None, NON_DIGITS)
+                out += sum_digit_lines(chunk)
+                start = end
+
+    return out
+
+
 NUMBERS = {
     "one": "1",
     "two": "2",
@@ -50,7 +87,22 @@ reverse_pattern = re.compile(
 )
 
 
+# greedy .* runs to the end of the line and backs off to the last place a
+# number starts, so overlapping matches need no reversed copy of the line
+last_pattern = re.compile(f".*({pattern.pattern})")
+
+
 def get_first_and_last(key):
+    a = pattern.search(key).group(0)
+    b = last_pattern.match(key).group(1)
+
+    a = NUMBERS.get(a) or a
+    b = NUMBERS.get(b) or b
+
+    return a, b
+
+
+def get_first_and_last_reversed(key):
     a = pattern.search(key).group(0)
     b = reverse_string(reverse_pattern.search(reverse_string(key)).group(0))
 
@@ -71,3 +123,13 @@ def part_two(keys):
         out += get_calibration_advanced(key)
 
     return out
+
+
+def solve(keys):
+    # both parts from a single pass over the keys
+    one = two = 0
+    for key in keys:
+        one += get_calibration_value(key)
+        two += get_calibration_advanced(key)
+
+    return one, two
@@ -1,7 +1,19 @@
+from __future__ import annotations
+from array import array
 from dataclasses import dataclass, field
+import os
+from pathlib import Path
 import re
+import tempfile
 from typing import Iterable
 
+from aoc2023 import read_lines
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional extra
+    np = None
+
 Cubes = dict[str, int]
 
 
@@ -18,6 +30,7 @@ class Game:
 
 
 RE_DIGIT = re.compile("\d+")
+RE_CUBES = re.compile(r"(\d+) (red|green|blue)")
 
 
 def parse_game(game: str):
@@ -38,6 +51,28 @@ def parse_game(game: str):
     return game
 
 
+def scan_game(game: str) -> tuple[int, int, int, int]:
+    # game number and the most of each colour seen in any round, without
+    # building the Game
+    game_str, round_strs = game.split(":")
+
+    red = green = blue = 0
+    for n, colour in RE_CUBES.findall(round_strs):
+        n = int(n)
+        if colour == "red":
+            red = max(red, n)
+        elif colour == "green":
+            green = max(green, n)
+        else:
+            blue = max(blue, n)
+
+    return int(RE_DIGIT.search(game_str).group(0)), red, green, blue
+
+
+def bag_limits(cubes: Cubes) -> tuple[int, int, int]:
+    return cubes.get("red", 0), cubes.get("green", 0), cubes.get("blue", 0)
+
+
 def is_valid_game(cubes: Cubes, game: Game) -> bool:
     for round in game.rounds:
         for colour, n in round.cubes.items():
@@ -48,11 +83,13 @@ def is_valid_game(cubes: Cubes, game: Game) -> bool:
 
 
 def part_one(cubes: Cubes, games: list[str]):
+    max_red, max_green, max_blue = bag_limits(cubes)
+
     out = 0
     for game_str in games:
-        game: Game = parse_game(game_str)
-        if is_valid_game(cubes, game):
-            out += game.number
+        number, red, green, blue = scan_game(game_str)
+        if red <= max_red and green <= max_green and blue <= max_blue:
+            out += number
 
     return out
 
@@ -78,9 +115,118 @@ def get_power_cubes(cubes: Cubes) -> int:
 def part_two(games: list[str]) -> int:
     out = 0
     for game_str in games:
-        game: Game = parse_game(game_str)
-        cubes: Cubes = get_min_cubes(game)
-        power = get_power_cubes(cubes)
-        out += power
+        _, red, green, blue = scan_game(game_str)
+        out += red * green * blue
 
-    return out
\ No newline at end of file
+    return out
+
+
+def solve(cubes: Cubes, games: Iterable[str]) -> tuple[int, int]:
+    # both parts from a single scan of each game
+    max_red, max_green, max_blue = bag_limits(cubes)
+
+    valid = power = 0
+    for game_str in games:
+        number, red, green, blue = scan_game(game_str)
+        if red <= max_red and green <= max_green and blue <= max_blue:
+            valid += number
+        power += red * green * blue
+
+    return valid, power
+
+
+@dataclass
+class GameTable:
+    # one column per field of scan_game, one row per game
+    numbers: array = field(default_factory=lambda: array("i"))
+    red: array = field(default_factory=lambda: array("i"))
+    green: array = field(default_factory=lambda: array("i"))
+    blue: array = field(default_factory=lambda: array("i"))
+
+    def columns(self) -> list[array]:
+        return [self.numbers, self.red, self.green, self.blue]
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    @staticmethod
+    def from_lines(games: Iterable[str]) -> GameTable:
+        table = GameTable()
+        for game_str in games:
+            for column, value in zip(table.columns(), scan_game(game_str)):
+                column.append(value)
+        return table
+
+    @staticmethod
+    def from_file(fp: str, cache: bool = True) -> GameTable:
+        # the cached table sits next to the log and is reused until the log
+        # is newer than it; a cache that won't load is rebuilt from the log
+        fp = Path(fp)
+        cache_fp = fp.with_name(fp.name + ".table")
+
+        if cache and cache_fp.exists():
+            if cache_fp.stat().st_mtime >= fp.stat().st_mtime:
+                try:
+                    return GameTable.load(cache_fp)
+                except ValueError:
+                    pass
+
+        table = GameTable.from_lines(read_lines(fp))
+        if cache:
+            table.save(cache_fp)
+        return table
+
+    def save(self, fp: str) -> None:
+        # write beside the target and swap it in, so an interrupted save
+        # never leaves a partial table behind
+        fp = Path(fp)
+        with tempfile.NamedTemporaryFile(
+            dir=fp.parent, prefix=fp.name, suffix=".tmp", delete=False
+        ) as file:
+            try:
+                array("q", [len(self)]).tofile(file)
+                for column in self.columns():
+                    column.tofile(file)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, fp)
+
+    @staticmethod
+    def load(fp: str) -> GameTable:
+        table = GameTable()
+        with Path(fp).open("rb") as file:
+            header = array("q")
+            try:
+                header.fromfile(file, 1)
+            except EOFError:
+                raise ValueError(f"{fp} has no table header") from None
+
+            # the header's row count has to account for the whole file
+            n = header[0]
+            size = os.fstat(file.fileno()).st_size
+            expected = header.itemsize + len(table.columns()) * n * table.red.itemsize
+            if n < 0 or size != expected:
+                raise ValueError(f"{fp} is {size} bytes, expected {expected}")
+
+            for column in table.columns():
+                column.fromfile(file, n)
+        return table
+
+    def feasible(self, cubes: Cubes) -> int:
+        # sum of the numbers of the games this bag could have played
+        max_red, max_green, max_blue = bag_limits(cubes)
+
+        if np is not None:
+            numbers, red, green, blue = [
+                np.frombuffer(column, dtype=np.intc) for column in self.columns()
+            ]
+            valid = (red <= max_red) & (green <= max_green) & (blue <= max_blue)
+            return int(numbers[valid].sum(dtype=np.int64))
+
+        out = 0
+        for number, red, green, blue in zip(*self.columns()):
+            if red <= max_red and green <= max_green and blue <= max_blue:
+                out += number
+        return out
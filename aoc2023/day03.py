@@ -1,9 +1,13 @@
 from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
 from ast import List
 from curses.ascii import isdigit
 from dataclasses import dataclass, field
+from itertools import chain
 import logging
-from typing import Iterable
+import re
+from typing import Iterable, Iterator
 
 
 logger = logging.getLogger()
@@ -21,65 +25,148 @@ class Coord:
 @dataclass(eq=False)
 class PartNumber:
     value: int
-    coords: list[Coord] = field(default_factory=list)
+    # row, first column and end column (exclusive) of the digits
+    span: tuple[int, int, int] = (0, 0, 0)
 
-    def update(self, char: str, coord: Coord) -> None:
-        self.value = int(str(self.value) + str(char))
-        self.coords.append(coord)
+    @property
+    def coords(self) -> list[Coord]:
+        y, start, end = self.span
+        return [Coord(x, y) for x in range(start, end)]
 
 
 def is_symbol(char: str) -> bool:
     return not (char.isdigit() or char == ".")
 
 
+# cells that are neither digits nor dots
+RE_SYMBOL = re.compile(rb"[^.\d]")
+RE_NUMBER = re.compile(rb"\d+")
+
+
+def encode_row(line: str) -> bytes:
+    # one byte per cell, so columns line up across rows
+    try:
+        return line.encode("ascii")
+    except UnicodeEncodeError as error:
+        raise ValueError(f"non-ASCII cell in schematic row {line!r}") from error
+
+
 @dataclass
 class EngineBlock:
-    symbols: dict[Coord, str] = field(default_factory=dict)
-    numbers: dict[Coord, PartNumber] = field(default_factory=dict)
+    width: int = 0
+    height: int = 0
+    # one byte per cell, row after row
+    grid: bytearray = field(default_factory=bytearray)
+    # index into parts for digit cells, -1 everywhere else
+    part_ids: array = field(default_factory=lambda: array("i"))
+    parts: list[PartNumber] = field(default_factory=list)
+    # cells holding each kind of symbol
+    symbol_cells: dict[str, list[int]] = field(default_factory=dict)
+    # part ids next to each symbol cell
+    adjacent_parts: dict[int, tuple[int, ...]] = field(default_factory=dict)
 
     def __init__(self) -> None:
-        self.symbols = dict()
-        self.numbers = dict()
+        self.width = self.height = 0
+        self.grid = bytearray()
+        self.part_ids = array("i")
+        self.parts = list()
+        self.symbol_cells = dict()
+        self.adjacent_parts = dict()
 
-    def add_symbol(self, symbol: str, coord: Coord):
-        self.symbols[coord] = symbol
+    def index(self, coord: Coord) -> int:
+        if 0 <= coord.x < self.width and 0 <= coord.y < self.height:
+            return coord.y * self.width + coord.x
+        return -1
 
-    def get_symbol(self, coord: Coord):
-        return self.symbols.get(coord)
+    def coord(self, i: int) -> Coord:
+        return Coord(i % self.width, i // self.width)
 
-    def add_number(self, number: PartNumber, coord: Coord):
-        self.numbers[coord] = number
+    def get_symbol(self, coord: Coord):
+        if (i := self.index(coord)) >= 0 and RE_SYMBOL.match(self.grid, i):
+            return chr(self.grid[i])
+        return None
 
     def get_number(self, coord: Coord) -> PartNumber:
-        return self.numbers.get(coord)
+        if (i := self.index(coord)) >= 0 and (part_id := self.part_ids[i]) >= 0:
+            return self.parts[part_id]
+        return None
+
+    @property
+    def symbols(self) -> dict[Coord, str]:
+        # dict view for compatibility, built from the index on each access
+        return {
+            self.coord(i): symbol
+            for symbol, cells in self.symbol_cells.items()
+            for i in cells
+        }
+
+    @property
+    def numbers(self) -> dict[Coord, PartNumber]:
+        return {
+            self.coord(i): self.parts[part_id]
+            for i, part_id in enumerate(self.part_ids)
+            if part_id >= 0
+        }
 
     def load_block(self, input_lines: Iterable[str]) -> None:
-        for y, line in enumerate(input_lines):
-            for x, char in enumerate(line):
-                current_location = Coord(x, y)
-                if is_symbol(char):
-                    self.add_symbol(char, current_location)
-
-                # if digit, check back one to left -- if that's a number we can update
-                elif char.isdigit():
-                    previous = self.get_number(Coord(x - 1, y))
-
-                    if previous:
-                        previous.update(char, current_location)
-                        self.add_number(previous, current_location)
-
-                    # else it's a new number
-                    else:
-                        number = PartNumber(int(char))
-                        number.coords.append(current_location)
-                        self.add_number(number, current_location)
-
-                # else it's a dot
-                else:
-                    pass
+        # the lines have to be measured before any can be padded, but the
+        # grid is filled a row at a time rather than from a joined copy
+        lines = input_lines if isinstance(input_lines, list) else list(input_lines)
+        self.height = len(lines)
+        self.width = max((len(line) for line in lines), default=0)
+        self.grid = bytearray()
+        for line in lines:
+            self.grid += encode_row(line)
+            self.grid += b"." * (self.width - len(line))
+        self.part_ids = array("i", [-1]) * len(self.grid)
+        self.parts = list()
+
+        # one part record per run of digits, searched a row at a time so
+        # runs can't wrap onto the next row
+        for y in range(self.height):
+            offset = y * self.width
+            for match in RE_NUMBER.finditer(self.grid, offset, offset + self.width):
+                start, end = match.span()
+                span = (y, start - offset, end - offset)
+                self.part_ids[start:end] = array("i", [len(self.parts)]) * (end - start)
+                self.parts.append(PartNumber(int(match.group(0)), span))
+
+        self.symbol_cells = dict()
+        self.adjacent_parts = dict()
+        for match in RE_SYMBOL.finditer(self.grid):
+            i = match.start()
+            symbol = match.group(0).decode("ascii")
+            self.symbol_cells.setdefault(symbol, list()).append(i)
+            self.adjacent_parts[i] = tuple(sorted(self.part_ids_near(i)))
+
+    def gears(
+        self, symbol: str = "*", arity: int = 2
+    ) -> Iterator[tuple[PartNumber, ...]]:
+        # numbers around each symbol of this kind that touches exactly arity
+        for i in self.symbol_cells.get(symbol, []):
+            if len(part_ids := self.adjacent_parts[i]) == arity:
+                yield tuple(self.parts[part_id] for part_id in part_ids)
+
+    def neighbours(self, i: int) -> Iterator[int]:
+        # indices of the up to eight cells around cell i
+        width = self.width
+        x = i % width
+        left = -1 if x > 0 else 0
+        right = 2 if x < width - 1 else 1
+
+        for row in (i - width, i, i + width):
+            if row < 0 or row >= len(self.grid):
+                continue
+            for dx in range(left, right):
+                if row + dx != i:
+                    yield row + dx
+
+    def part_ids_near(self, i: int) -> set[int]:
+        part_ids = self.part_ids
+        return {part_ids[j] for j in self.neighbours(i) if part_ids[j] >= 0}
 
     def __getitem__(self, coord: Coord) -> str:
-        return self.symbols.get(coord) or self.numbers.get(coord)
+        return self.get_symbol(coord) or self.get_number(coord)
 
 
 def vicinity(coord: Coord) -> list[Coord]:
@@ -99,39 +186,119 @@ def vicinity(coord: Coord) -> list[Coord]:
 
 
 def get_numbers_in_vicinity(engine: EngineBlock, anchor: Coord) -> list[PartNumber]:
-    numbers = set()
-    for coord in vicinity(anchor):
-        if (number := engine.get_number(coord)) is not None:
-            numbers.add(number)
+    if (i := engine.index(anchor)) < 0:
+        return list()
+    return [engine.parts[part_id] for part_id in engine.part_ids_near(i)]
+
+
+def sum_part_numbers(engine: EngineBlock) -> int:
+    part_ids = set()
+    for adjacent in engine.adjacent_parts.values():
+        part_ids.update(adjacent)
 
-    return list(numbers)
+    return sum([engine.parts[part_id].value for part_id in part_ids])
 
 
-def part_one(data):
+def part_one(data, streaming: bool = False):
+    if streaming:
+        return solve_streaming(data)[0]
+
     engine = EngineBlock()
     engine.load_block(data)
+    return sum_part_numbers(engine)
+
 
-    numbers = set()
-    for coord in engine.symbols:
-        adjacent_numbers = get_numbers_in_vicinity(engine, coord)
-        numbers.update(adjacent_numbers)
+def sum_gear_ratios(engine: EngineBlock) -> int:
+    out = 0
+
+    for a, b in engine.gears("*", 2):
+        out += a.value * b.value
+        logger.info(f"* found by {a.span}: {a.value} x {b.value}")
+        logger.info(f"Running total: {out}")
 
-    return sum([n.value for n in numbers])
+    return out
 
 
-def part_two(data):
+def part_two(data, streaming: bool = False):
+    if streaming:
+        return solve_streaming(data)[1]
+
     engine = EngineBlock()
     engine.load_block(data)
+    return sum_gear_ratios(engine)
 
-    out = 0
 
-    for coord, symbol in engine.symbols.items():
-        if symbol == "*":
-            numbers = get_numbers_in_vicinity(engine, coord)
-            if len(numbers) == 2:
-                a, b = numbers[0].value, numbers[1].value
-                out += a * b
-                logger.info(f"{symbol} found at {coord}: {a} x {b} = {a*b}")
-                logger.info(f"Running total: {out}")
+def solve(data) -> tuple[int, int]:
+    # both parts from a single load of the schematic
+    engine = EngineBlock()
+    engine.load_block(data)
+    return sum_part_numbers(engine), sum_gear_ratios(engine)
 
-    return out
+
+@dataclass
+class SchematicRow:
+    # (start, end, value) of each number, end exclusive, left to right
+    numbers: list[tuple[int, int, int]] = field(default_factory=list)
+    starts: list[int] = field(default_factory=list)
+    symbols: list[int] = field(default_factory=list)
+    gears: list[int] = field(default_factory=list)
+
+    @staticmethod
+    def from_line(line: str) -> SchematicRow:
+        row = SchematicRow()
+        data = encode_row(line.strip())
+        for match in RE_NUMBER.finditer(data):
+            row.numbers.append((match.start(), match.end(), int(match.group(0))))
+            row.starts.append(match.start())
+        for match in RE_SYMBOL.finditer(data):
+            row.symbols.append(match.start())
+            if match.group(0) == b"*":
+                row.gears.append(match.start())
+        return row
+
+    def has_symbol(self, left: int, right: int) -> bool:
+        k = bisect_left(self.symbols, left)
+        return k < len(self.symbols) and self.symbols[k] <= right
+
+    def numbers_touching(self, x: int) -> Iterator[int]:
+        # numbers in this row that reach column x - 1, x or x + 1
+        k = bisect_right(self.starts, x + 1) - 1
+        while k >= 0 and self.numbers[k][1] >= x:
+            yield self.numbers[k][2]
+            k -= 1
+
+
+def score_row(
+    above: SchematicRow, row: SchematicRow, below: SchematicRow
+) -> tuple[int, int]:
+    window = (above, row, below)
+
+    part_numbers = 0
+    for start, end, value in row.numbers:
+        if any(r.has_symbol(start - 1, end) for r in window):
+            part_numbers += value
+
+    gear_ratios = 0
+    for x in row.gears:
+        numbers = [n for r in window for n in r.numbers_touching(x)]
+        if len(numbers) == 2:
+            gear_ratios += numbers[0] * numbers[1]
+
+    return part_numbers, gear_ratios
+
+
+def solve_streaming(lines: Iterable[str]) -> tuple[int, int]:
+    # adjacency never reaches past the rows either side, so only three rows
+    # are held at once
+    part_numbers = gear_ratios = 0
+
+    above, row = SchematicRow(), None
+    for below in chain(map(SchematicRow.from_line, lines), [SchematicRow()]):
+        if row is not None:
+            p, g = score_row(above, row, below)
+            part_numbers += p
+            gear_ratios += g
+            above = row
+        row = below
+
+    return part_numbers, gear_ratios
@@ -6,11 +6,24 @@ from typing import Iterable
 logger = logging.getLogger()
 
 
-@dataclass
+def to_mask(values: Iterable[str]) -> int:
+    mask = 0
+    for value in values:
+        mask |= 1 << int(value)
+    return mask
+
+
+def from_mask(mask: int) -> set[int]:
+    return {i for i in range(mask.bit_length()) if mask >> i & 1}
+
+
+@dataclass(frozen=True, slots=True)
 class ScratchCard:
     card_id: int
-    winners: set[int]
-    numbers: set[int]
+    # bit n is set when n is on that side of the card
+    winners_mask: int
+    numbers_mask: int
+    matches: int
 
     @staticmethod
     def from_line(line: str) -> ScratchCard:
@@ -19,30 +32,46 @@ class ScratchCard:
         _, card_id = card.split()
 
         win, num = digits.split("|")
-        winners = set([int(x) for x in win.split()])
-        numbers = set([int(x) for x in num.split()])
+        winners = to_mask(win.split())
+        numbers = to_mask(num.split())
+
+        return ScratchCard(
+            card_id=int(card_id),
+            winners_mask=winners,
+            numbers_mask=numbers,
+            matches=(winners & numbers).bit_count(),
+        )
 
-        return ScratchCard(card_id=int(card_id), winners=winners, numbers=numbers)
+    @property
+    def winners(self) -> set[int]:
+        return from_mask(self.winners_mask)
+
+    @property
+    def numbers(self) -> set[int]:
+        return from_mask(self.numbers_mask)
 
     def calculate_points(self) -> int:
-        if (i := self.calculate_matches()) > 0:
+        if (i := self.matches) > 0:
             return 2 ** (i - 1)
         else:
             return 0
 
     def calculate_matches(self) -> int:
-        return len(self.winners.intersection(self.numbers))
+        return self.matches
 
 
-def part_one(lines: Iterable[str]) -> int:
+def total_points(cards: Iterable[ScratchCard]) -> int:
     out = 0
-    for line in lines:
-        card = ScratchCard.from_line(line)
+    for card in cards:
         out += card.calculate_points()
 
     return out
 
 
+def part_one(lines: Iterable[str]) -> int:
+    return total_points(ScratchCard.from_line(line) for line in lines)
+
+
 CardDict = dict[int, ScratchCard]
 
 
@@ -61,7 +90,26 @@ def resolve_card(card: ScratchCard, card_dict: CardDict, running_total=0):
         )
 
 
+def count_cards(cards: list[ScratchCard]) -> int:
+    # forward pass: each card adds its copy count to the cards it wins
+    copies = [1] * len(cards)
+
+    for i, card in enumerate(cards):
+        matches = card.calculate_matches()
+        for j in range(i + 1, min(i + 1 + matches, len(cards))):
+            copies[j] += copies[i]
+        logger.debug(f"Card {card.card_id}: {copies[i]} copies")
+
+    return sum(copies)
+
+
 def part_two(lines: str) -> int:
+    cards = [ScratchCard.from_line(line) for line in lines]
+    return count_cards(cards)
+
+
+def part_two_recursive(lines: str) -> int:
+    # reference implementation -- exponential in the depth of the cascade
     cards = (ScratchCard.from_line(line) for line in lines)
     card_dict: CardDict = {card.card_id: card for card in cards}
 
@@ -73,7 +121,7 @@ def part_two(lines: str) -> int:
     return out
 
 
-# TODO: works but it's slow
-# * don't recalculate matches and points every time (use a frozen dataclass)
-# * save result from previous resolution of a card -- it's the same every time
-
+def solve(lines: Iterable[str]) -> tuple[int, int]:
+    # both parts from a single parse of the cards
+    cards = [ScratchCard.from_line(line) for line in lines]
+    return total_points(cards), count_cards(cards)
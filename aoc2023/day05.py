@@ -1,9 +1,15 @@
 from __future__ import annotations
+from bisect import bisect_right
 from dataclasses import dataclass, field
 import logging
 import math
 from turtle import left, right
-from typing import Iterable
+from typing import Callable, Iterable, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional extra
+    np = None
 
 FORMAT = "%(levelname) %(message)s"
 logging.basicConfig(format=FORMAT)
@@ -42,6 +48,49 @@ def parse_connector(line: str) -> tuple[int]:
 class FarmMap:
     name: str = None
     connectors: list[Connector] = field(default_factory=list)
+    starts: list[int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.build_index()
+
+    def build_index(self) -> None:
+        # sort connectors by source so lookups can bisect on their start points,
+        # and freeze them so the index can't go stale
+        self.connectors = tuple(sorted(self.connectors, key=lambda c: c.source))
+        self.starts = [connector.source for connector in self.connectors]
+
+    def find(self, value: int) -> Connector | None:
+        i = bisect_right(self.starts, value) - 1
+        if i >= 0 and value in self.connectors[i]:
+            return self.connectors[i]
+
+        return None
+
+    def map(self, value: int) -> int:
+        if (connector := self.find(value)) is not None:
+            return connector.map(value)
+
+        # unmapped values map to themselves
+        return value
+
+    def map_many(self, values):
+        if np is None or not isinstance(values, np.ndarray):
+            return [self.map(value) for value in values]
+
+        if not self.connectors:
+            return values
+
+        starts = np.array(self.starts, dtype=np.int64)
+        ends = starts + np.array([c.span for c in self.connectors], dtype=np.int64)
+        offsets = np.array(
+            [c.destination - c.source for c in self.connectors], dtype=np.int64
+        )
+
+        # index of the last connector starting at or before each value
+        i = np.searchsorted(starts, values, side="right") - 1
+        clipped = np.maximum(i, 0)
+        hit = (i >= 0) & (values < ends[clipped])
+        return values + np.where(hit, offsets[clipped], 0)
 
 
 @dataclass
@@ -53,13 +102,29 @@ class Almanac:
         logger.debug(f"{seed=}")
         for farm_map in self.maps:
             logger.debug(f"{farm_map.name}:")
-            for connector in farm_map.connectors:
-                if seed in connector:
-                    seed = connector.map(seed)
-                    break
+            seed = farm_map.map(seed)
             logger.debug(f"-> {seed}")
         return seed
 
+    def map_many(self, seeds: Sequence[int]):
+        # vectorised with numpy when it's installed, plain lists otherwise
+        if np is not None:
+            seeds = np.asarray(seeds, dtype=np.int64)
+        for farm_map in self.maps:
+            seeds = farm_map.map_many(seeds)
+        return seeds
+
+    def compose(self) -> FarmMap:
+        composed = compose([to_span_map(farm_map) for farm_map in self.maps])
+
+        connectors = list()
+        for connector in composed.connectors:
+            span = connector.source.right - connector.source.left + 1
+            connectors.append(
+                Connector(connector.source.left, connector.destination.left, span)
+            )
+        return FarmMap(name=composed.name, connectors=connectors)
+
 
 def parse_input(lines: Iterable[str]):
     lines = list(lines)
@@ -68,22 +133,21 @@ def parse_input(lines: Iterable[str]):
     i = j = 0
     while i < len(lines):
         if lines[i].endswith("map:"):
-            farm_map = FarmMap()
-            farm_map.name = lines[i].split()[0]
+            name = lines[i].split()[0]
+            connectors = list()
             j = i + 1
             while j < len(lines) and lines[j] != "":
                 source, destination, span = parse_connector(lines[j])
                 connector = Connector(source, destination, span)
-                farm_map.connectors.append(connector)
+                connectors.append(connector)
                 j += 1
-            almanac.maps.append(farm_map)
+            almanac.maps.append(FarmMap(name=name, connectors=connectors))
         i += 1
 
     return almanac
 
 
-def part_one(lines: Iterable[str]) -> int:
-    almanac = parse_input(lines)
+def lowest_location(almanac: Almanac) -> int:
     out = math.inf
     for seed in almanac.seeds:
         loc = almanac.map(seed)
@@ -93,6 +157,10 @@ def part_one(lines: Iterable[str]) -> int:
     return out
 
 
+def part_one(lines: Iterable[str]) -> int:
+    return lowest_location(parse_input(lines))
+
+
 @dataclass
 class Span:
     left: int
@@ -167,10 +235,134 @@ class SpanConnector:
 class SpanMap:
     name: str = None
     connectors: list[SpanConnector] = field(default_factory=list)
+    starts: list[int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.build_index()
 
     def __contains__(self, span: Span):
         return any([span in connector for connector in self.connectors])
 
+    def build_index(self) -> None:
+        # sort connectors by source so a span only walks the ones it overlaps,
+        # and freeze them so the index can't go stale
+        self.connectors = tuple(sorted(self.connectors, key=lambda c: c.source.left))
+        self.starts = [connector.source.left for connector in self.connectors]
+
+    def map(self, span: Span) -> list[Span]:
+        out = list()
+        left = span.left
+        i = max(bisect_right(self.starts, left) - 1, 0)
+
+        while left <= span.right and i < len(self.connectors):
+            connector = self.connectors[i]
+            source = connector.source
+
+            if source.right < left:
+                i += 1
+                continue
+            if source.left > span.right:
+                break
+
+            # gap before this connector maps to itself
+            if source.left > left:
+                out.append(Span(left, source.left - 1))
+                left = source.left
+
+            right = min(source.right, span.right)
+            out.append(connector.map(Span(left, right)))
+            left = right + 1
+            i += 1
+
+        # anything past the last connector maps to itself
+        if left <= span.right:
+            out.append(Span(left, span.right))
+
+        return out
+
+
+def to_span_map(farm_map: FarmMap) -> SpanMap:
+    connectors = list()
+    for connector in farm_map.connectors:
+        last = connector.span - 1
+        connectors.append(
+            SpanConnector(
+                Span(connector.source, connector.source + last),
+                Span(connector.destination, connector.destination + last),
+            )
+        )
+    return SpanMap(name=farm_map.name, connectors=connectors)
+
+
+def compose_name(maps: list[SpanMap]) -> str:
+    if not maps or maps[0].name is None or maps[-1].name is None:
+        return None
+    source = maps[0].name.split("-to-")[0]
+    destination = maps[-1].name.split("-to-")[-1]
+    return f"{source}-to-{destination}"
+
+
+def compose(maps: list[SpanMap]) -> SpanMap:
+    # beyond the largest value any connector touches, every map is the identity
+    upper = 0
+    for span_map in maps:
+        for connector in span_map.connectors:
+            upper = max(upper, connector.source.right, connector.destination.right)
+
+    # (source span, offset) segments of the composed map, starting from identity
+    segments = [(Span(0, upper), 0)]
+
+    for span_map in maps:
+        next_segments = list()
+        for source, offset in segments:
+            # pieces come back in order, so walk the source alongside them
+            left = source.left
+            image = Span(source.left + offset, source.right + offset)
+            for piece in span_map.map(image):
+                width = piece.right - piece.left
+                next_segments.append((Span(left, left + width), piece.left - left))
+                left += width + 1
+        segments = next_segments
+        logger.debug(f"{span_map.name}: {len(segments)} segments")
+
+    connectors = list()
+    previous_offset = None
+    for source, offset in sorted(segments, key=lambda segment: segment[0].left):
+        # identity segments are implied, so only keep the ones that move values
+        if offset == 0:
+            previous_offset = None
+            continue
+
+        # merge neighbouring segments that share an offset
+        if offset == previous_offset:
+            last = connectors[-1]
+            last.source = Span(last.source.left, source.right)
+            last.destination = Span(last.destination.left, source.right + offset)
+        else:
+            connectors.append(
+                SpanConnector(source, Span(source.left + offset, source.right + offset))
+            )
+        previous_offset = offset
+
+    return SpanMap(name=compose_name(maps), connectors=connectors)
+
+
+def merge_spans(spans: list[Span]) -> list[Span]:
+    out = list()
+    for span in sorted(spans, key=lambda span: span.left):
+        # merge spans that overlap or sit right next to each other
+        if out and span.left <= out[-1].right + 1:
+            if span.right > out[-1].right:
+                out[-1] = Span(out[-1].left, span.right)
+        else:
+            out.append(span)
+
+    return out
+
+
+# called with (map name, fragments produced, spans left after merging)
+StatsHook = Callable[[str, int, int], None]
+
 
 def parse_span_seeds(seeds: list[int]) -> list[Span]:
     ks = range(0, len(seeds), 2)
@@ -201,45 +393,28 @@ class SpanAlmanac:
     #         logger.debug(f"-> {seed}")
     #     return seed
 
-    def map(self, seeds: list[Span], idx: int = 0) -> Span:
-        # if we're out of maps, return seeds unchanged
-        if idx >= len(self.maps):
-            return seeds
-
-        # pick map we're on
-        farm_map = self.maps[idx]
-        logger.debug(f"{farm_map.name}: {len(seeds)} seeds")
-
-        # mapped seeds to carry to next map
-        next_seeds = list()
-
-        # while seeds in input,
-        while seeds:
-            seed = seeds.pop()
-            logger.debug(f"~ {seed}")
-            for connector in farm_map.connectors:
-                # if it overlaps with any connector
-                if seed.overlaps(connector.source):  # TODO
-                    logger.debug(f"! {connector.source}")
-                    # map the overlapping part
-                    seed, leftovers = seed.slice(connector.source)  # TODO
-                    seed = connector.map(seed)
-                    next_seeds.append(seed)
-                    logger.debug(f"> {seed}")
-                    # add leftovers to seeds to process
-                    for lo in leftovers:
-                        seeds.append(lo)
-                        logger.debug(f"lo {lo}")
-                    # break out of this iteration of for loop
-                    break
-                # logger.debug(f"? {connector.source}")
-            else:
-                # if no overlaps found, maps to self
-                next_seeds.append(seed)
-                logger.debug(f"-> {seed}")
-
-        # once all seeds are mapped, recurse with next map
-        return self.map(next_seeds, idx=idx + 1)
+    def compose(self) -> SpanMap:
+        return compose(self.maps)
+
+    def map(self, seeds: list[Span], stats: StatsHook = None) -> list[Span]:
+        for farm_map in self.maps:
+            logger.debug(f"{farm_map.name}: {len(seeds)} seeds")
+
+            # mapped seeds to carry to next map
+            fragments = list()
+            for seed in seeds:
+                mapped = farm_map.map(seed)
+                logger.debug(f"~ {seed} -> {mapped}")
+                fragments.extend(mapped)
+
+            # coalesce before the next map so fragments don't multiply
+            next_seeds = merge_spans(fragments)
+            if stats is not None:
+                stats(farm_map.name, len(fragments), len(next_seeds))
+
+            seeds = next_seeds
+
+        return seeds
 
 
 def parse_span_input(lines: Iterable[str]):
@@ -249,24 +424,43 @@ def parse_span_input(lines: Iterable[str]):
     i = j = 0
     while i < len(lines):
         if lines[i].endswith("map:"):
-            farm_map = SpanMap()
-            farm_map.name = lines[i].split()[0]
+            name = lines[i].split()[0]
+            connectors = list()
             j = i + 1
             while j < len(lines) and lines[j] != "":
                 source, destination, width = parse_connector(lines[j])
+                # spans are inclusive at both ends
                 connector = SpanConnector(
-                    Span(source, source + width), Span(destination, destination + width)
+                    Span(source, source + width - 1),
+                    Span(destination, destination + width - 1),
                 )
-                farm_map.connectors.append(connector)
+                connectors.append(connector)
                 j += 1
-            almanac.maps.append(farm_map)
+            almanac.maps.append(SpanMap(name=name, connectors=connectors))
         i += 1
 
     return almanac
 
 
-def part_two(lines: Iterable[str]) -> int:
-    almanac = parse_span_input(lines)
-    locations = almanac.map(almanac.seeds)
+def to_span_almanac(almanac: Almanac) -> SpanAlmanac:
+    return SpanAlmanac(
+        seeds=parse_span_seeds(almanac.seeds),
+        maps=[to_span_map(farm_map) for farm_map in almanac.maps],
+    )
+
+
+def lowest_span_location(almanac: SpanAlmanac) -> int:
+    seed_to_location = almanac.compose()
+    locations = [loc for seed in almanac.seeds for loc in seed_to_location.map(seed)]
     logger.debug(f"Final locations: {locations}")
     return min([loc.left for loc in locations])
+
+
+def part_two(lines: Iterable[str]) -> int:
+    return lowest_span_location(parse_span_input(lines))
+
+
+def solve(lines: Iterable[str]) -> tuple[int, int]:
+    # part two reads the same almanac with the seeds taken as ranges
+    almanac = parse_input(lines)
+    return lowest_location(almanac), lowest_span_location(to_span_almanac(almanac))
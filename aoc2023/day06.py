@@ -1,4 +1,5 @@
 import logging
+import math
 from typing import Iterable
 
 logger = logging.getLogger()
@@ -19,20 +20,39 @@ def parse_input(lines: Iterable[str]) -> tuple[list[int], list[int]]:
     return times, distances
 
 
-def n_winners(time, record) -> int:
-    logger.debug(f"Time: {time}  Record: {record}")
+def n_winners_brute_force(time, record) -> int:
     t = 0
 
-    while t < time and t * (time - t) < record:
+    while t <= time // 2 and t * (time - t) <= record:
         t += 1
 
     logger.debug(f"{t=}")
-    return time + 1 - 2 * t
+    return max(time + 1 - 2 * t, 0)
 
 
-def part_one(lines: Iterable[str]) -> int:
-    times, distances = parse_input(lines)
+def n_winners(time, record, brute_force: bool = False) -> int:
+    logger.debug(f"Time: {time}  Record: {record}")
+    if brute_force:
+        return n_winners_brute_force(time, record)
+
+    # winning hold times t satisfy t^2 - time * t + record < 0
+    discriminant = time * time - 4 * record
+    if discriminant <= 0:
+        return 0
+
+    t = max((time - math.isqrt(discriminant)) // 2, 0)
+
+    # isqrt rounds down, so nudge t onto the first winning hold time
+    while t <= time // 2 and t * (time - t) <= record:
+        t += 1
+    while t > 0 and (t - 1) * (time - t + 1) > record:
+        t -= 1
+
+    logger.debug(f"{t=}")
+    return max(time + 1 - 2 * t, 0)
+
 
+def margin(times: list[int], distances: list[int]) -> int:
     out = 1
     for t, d in zip(times, distances):
         out *= n_winners(t, d)
@@ -40,6 +60,10 @@ def part_one(lines: Iterable[str]) -> int:
     return out
 
 
+def part_one(lines: Iterable[str]) -> int:
+    return margin(*parse_input(lines))
+
+
 def parse_input_kerning(lines: Iterable[str]) -> tuple[list[int], list[int]]:
     times = list()
     distances = list()
@@ -58,3 +82,12 @@ def parse_input_kerning(lines: Iterable[str]) -> tuple[list[int], list[int]]:
 def part_two(lines: Iterable[str]) -> int:
     time, distance = parse_input_kerning(lines)
     return n_winners(time, distance)
+
+
+def solve(lines: Iterable[str]) -> tuple[int, int]:
+    times, distances = parse_input(lines)
+
+    # without the kerning each row is one number, its races' digits run together
+    time = int("".join(str(t) for t in times))
+    distance = int("".join(str(d) for d in distances))
+    return margin(times, distances), n_winners(time, distance)
@@ -1,9 +1,15 @@
 from __future__ import annotations
+from array import array
 from collections import Counter
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cache
+import heapq
+from itertools import combinations_with_replacement, permutations
 import logging
-from typing import Iterable
+from pathlib import Path
+import tempfile
+from typing import Iterable, Iterator
 
 logger = logging.getLogger()
 
@@ -65,19 +71,79 @@ class HandType(Enum):
         return self._value_ <= other._value_
 
 
+def hand_type_from_counts(first_count: int, second_count: int) -> HandType:
+    if first_count == 5:
+        return HandType.FIVE_KIND
+    elif first_count == 4:
+        return HandType.FOUR_KIND
+    elif first_count == 3 and second_count == 2:
+        return HandType.FULL_HOUSE
+    elif first_count == 3:
+        return HandType.THREE_KIND
+    elif first_count == 2 and second_count == 2:
+        return HandType.TWO_PAIR
+    elif first_count == 2:
+        return HandType.ONE_PAIR
+    else:
+        return HandType.HIGH_CARD
+
+
+def hand_index(ranks: Iterable[int]) -> int:
+    # ranks are card ranks less one (so the joker is 0), read as base 14
+    index = 0
+    for rank in ranks:
+        index = index * 14 + rank
+    return index
+
+
+def classify_ranks(ranks: tuple[int], jokers: bool) -> HandType:
+    n_jokers = ranks.count(0) if jokers else 0
+    counts = [ranks.count(rank) for rank in set(ranks) if not (jokers and rank == 0)]
+    counts = sorted(counts, reverse=True) + [0, 0]
+
+    # jokers always do best joining the most common card
+    return hand_type_from_counts(counts[0] + n_jokers, counts[1])
+
+
+@cache
+def hand_type_table(jokers: bool) -> bytearray:
+    # hand type only depends on which cards are held, so classify each
+    # multiset once and fill in all of its orderings
+    table = bytearray(14**5)
+    for hand in combinations_with_replacement(range(14), 5):
+        hand_type = classify_ranks(hand, jokers).value
+        for ranks in set(permutations(hand)):
+            table[hand_index(ranks)] = hand_type
+    return table
+
+
 @dataclass
 class Hand:
     cards: list[Card] = field(default_factory=list)
     hand_type: HandType = None
     bid: int = 0
     jokers: bool = False
+    key: int = 0
 
     def __init__(self, cards: list[Card], jokers: bool = False) -> None:
         self.cards = cards
         self.jokers = jokers
         self.hand_type = self.infer_hand_type()
+        self.key = self.sort_key()
+
+    def sort_key(self) -> int:
+        # hand type in the high bits, then one nibble per card rank
+        key = self.hand_type.value
+        for card in self.cards:
+            key = (key << 4) | card.rank
+        return key
 
     def infer_hand_type(self) -> HandType:
+        index = hand_index([card.rank - 1 for card in self.cards])
+        return HandType(hand_type_table(self.jokers)[index])
+
+    def infer_hand_type_counter(self) -> HandType:
+        # reference classifier, used to check the lookup table
         counts = Counter(self.cards)
 
         first_card, first_count = counts.most_common(1)[0]
@@ -110,43 +176,16 @@ class Hand:
                 if second_count > first_count:
                     first_count, second_count = second_count, first_count
 
-        if first_count == 5:
-            return HandType.FIVE_KIND
-        elif first_count == 4:
-            return HandType.FOUR_KIND
-        elif first_count == 3 and second_count == 2:
-            return HandType.FULL_HOUSE
-        elif first_count == 3:
-            return HandType.THREE_KIND
-        elif first_count == 2 and second_count == 2:
-            return HandType.TWO_PAIR
-        elif first_count == 2:
-            return HandType.ONE_PAIR
-        else:
-            return HandType.HIGH_CARD
+        return hand_type_from_counts(first_count, second_count)
 
     def __eq__(self, other: Hand):
         return self.hand_type == other.hand_type and self.cards == other.cards
 
     def __lt__(self, other: Card):
-        if self.hand_type != other.hand_type:
-            return self.hand_type < other.hand_type
-
-        for self_card, other_card in zip(self.cards, other.cards):
-            if self_card != other_card:
-                return self_card < other_card
-
-        return False
+        return self.key < other.key
 
     def __le__(self, other: Card):
-        if self.hand_type != other.hand_type:
-            return self.hand_type <= other.hand_type
-
-        for self_card, other_card in zip(self.cards, other.cards):
-            if self_card != other_card:
-                return self_card <= other_card
-
-        return True
+        return self.key <= other.key
 
     def __repr__(self):
         return "".join([str(card) for card in self.cards])
@@ -172,21 +211,166 @@ def parse_input(lines: Iterable[str], jokers: bool = False) -> list[Hand]:
     return hands
 
 
-def part_one(lines: Iterable[str]) -> int:
+RANKS = {card.char: card.rank for card in Card}
+
+# low bits of a packed record hold the line number, so equal hands keep
+# their input order like a stable sort would
+SEQ_BITS = 40
+SEQ_MASK = (1 << SEQ_BITS) - 1
+RUN_BLOCK = 1 << 16
+
+
+def encode_hand(card_str: str, jokers: bool = False) -> int:
+    # same value as Hand.key, without building the Hand
+    ranks = [1 if jokers and char == "J" else RANKS[char] for char in card_str]
+    key = hand_type_table(jokers)[hand_index([rank - 1 for rank in ranks])]
+    for rank in ranks:
+        key = (key << 4) | rank
+    return key
+
+
+def sorted_run(keys: array, bids: array, first_seq: int) -> array:
+    # keys carry their line number, which finds each bid without keeping
+    # (key, bid) pairs around while sorting
+    run = array("Q")
+    for packed in sorted(keys):
+        run.append(packed)
+        run.append(bids[(packed & SEQ_MASK) - first_seq])
+    return run
+
+
+def spill_run(run: array, tmp_dir: str, n: int) -> Path:
+    path = Path(tmp_dir) / f"run{n:06d}.bin"
+    with path.open("wb") as file:
+        run.tofile(file)
+    return path
+
+
+def read_run(path: Path) -> Iterator[tuple[int, int]]:
+    with path.open("rb") as file:
+        while True:
+            block = array("Q")
+            try:
+                block.fromfile(file, 2 * RUN_BLOCK)
+            except EOFError:
+                pass  # a short final block still loads what's there
+            if not block:
+                return
+            yield from zip(block[::2], block[1::2])
+
+
+def iter_run(run: array) -> Iterator[tuple[int, int]]:
+    return zip(run[::2], run[1::2])
+
+
+def merge_runs(paths: list[Path], tmp_dir: str, n: int) -> Path:
+    path = Path(tmp_dir) / f"run{n:06d}.bin"
+    with path.open("wb") as file:
+        block = array("Q")
+        for record in heapq.merge(*(read_run(run) for run in paths)):
+            block.extend(record)
+            if len(block) >= 2 * RUN_BLOCK:
+                block.tofile(file)
+                block = array("Q")
+        block.tofile(file)
+
+    for run in paths:
+        run.unlink()
+    return path
+
+
+def total_winnings_streaming(
+    lines: Iterable[str],
+    jokers: bool = False,
+    chunk_size: int = 1_000_000,
+    max_fan_in: int = 32,
+) -> int:
+    if max_fan_in < 2:
+        raise ValueError(f"{max_fan_in=} must be at least 2")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = list()
+        n_runs = 0
+        keys, bids = array("Q"), array("Q")
+        first_seq = 0
+
+        for seq, line in enumerate(lines):
+            card_str, bid = line.split()
+            keys.append((encode_hand(card_str, jokers) << SEQ_BITS) | seq)
+            bids.append(int(bid))
+
+            if len(keys) >= chunk_size:
+                run = sorted_run(keys, bids, first_seq)
+                paths.append(spill_run(run, tmp_dir, n_runs))
+                n_runs += 1
+                logger.debug(f"Spilled run {n_runs}")
+                keys, bids = array("Q"), array("Q")
+                first_seq = seq + 1
+
+        # merge spilled runs a group at a time until the final merge,
+        # which also takes the in-memory run, stays within max_fan_in
+        while len(paths) >= max_fan_in:
+            merged = list()
+            for i in range(0, len(paths), max_fan_in):
+                group = paths[i : i + max_fan_in]
+                if len(group) == 1:
+                    merged.extend(group)
+                    continue
+                merged.append(merge_runs(group, tmp_dir, n_runs))
+                n_runs += 1
+            logger.debug(f"Merged {len(paths)} runs into {len(merged)}")
+            paths = merged
+
+        # the last run never needs to leave memory
+        runs = [read_run(path) for path in paths]
+        runs.append(iter_run(sorted_run(keys, bids, first_seq)))
+
+        out = 0
+        for rank, (_, bid) in enumerate(heapq.merge(*runs), start=1):
+            out += rank * bid
+
+        return out
+
+
+def part_one(lines: Iterable[str], streaming: bool = False) -> int:
+    if streaming:
+        return total_winnings_streaming(lines)
+
     hands = parse_input(lines)
 
     out = 0
-    for rank, hand in enumerate(sorted(hands), start=1):
+    for rank, hand in enumerate(sorted(hands, key=lambda hand: hand.key), start=1):
         out += rank * hand.bid
 
     return out
 
 
-def part_two(lines: Iterable[str]) -> int:
+def part_two(lines: Iterable[str], streaming: bool = False) -> int:
+    if streaming:
+        return total_winnings_streaming(lines, jokers=True)
+
     hands = parse_input(lines, jokers=True)
 
     out = 0
-    for rank, hand in enumerate(sorted(hands), start=1):
+    for rank, hand in enumerate(sorted(hands, key=lambda hand: hand.key), start=1):
         out += rank * hand.bid
 
     return out
+
+
+def total_winnings(hands: list[tuple[str, int]], jokers: bool = False) -> int:
+    # sorted is stable, so equal hands keep their input order as in part_one
+    keyed = [(encode_hand(card_str, jokers), bid) for card_str, bid in hands]
+    keyed.sort(key=lambda record: record[0])
+
+    out = 0
+    for rank, (_, bid) in enumerate(keyed, start=1):
+        out += rank * bid
+
+    return out
+
+
+def solve(lines: Iterable[str]) -> tuple[int, int]:
+    # both parts rank the same hands, only the value of J changes
+    hands = [(card_str, int(bid)) for card_str, bid in map(str.split, lines)]
+    return total_winnings(hands), total_winnings(hands, jokers=True)
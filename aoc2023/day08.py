@@ -1,4 +1,6 @@
 from __future__ import annotations
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 import logging
 import math
@@ -28,6 +30,193 @@ class Instructions:
         self.nodes[node_name] = node
         return node
 
+    def compile(self) -> Network:
+        # intern node names as ints in the order they were first seen
+        names = list(self.nodes)
+        ids = {name: i for i, name in enumerate(names)}
+        nodes = [self.nodes[name] for name in names]
+
+        return Network(
+            names=names,
+            ids=ids,
+            left=array("i", [ids[node.left.name] for node in nodes]),
+            right=array("i", [ids[node.right.name] for node in nodes]),
+            directions=bytes([direction == "R" for direction in self.directions]),
+        )
+
+
+@dataclass
+class Network:
+    names: list[str]
+    ids: dict[str, int]
+    left: array
+    right: array
+    # one byte per instruction, 0 for L and 1 for R
+    directions: bytes
+
+    def targets(self, suffix: str) -> bytearray:
+        return bytearray([name.endswith(suffix) for name in self.names])
+
+    def jump_table(self, targets: bytearray, levels: int = 32) -> JumpTable:
+        tables = (self.left, self.right)
+        n = len(self.names)
+        # a reachable target is hit within n passes, so the lifts must be
+        # able to skip at least that many
+        levels = max(levels, n.bit_length())
+
+        # walk every node through one full pass of the directions at once
+        current = list(range(n))
+        first_hit = array("i", [-1] * n)
+        for step, direction in enumerate(self.directions):
+            for node, position in enumerate(current):
+                if first_hit[node] < 0 and targets[position]:
+                    first_hit[node] = step
+            table = tables[direction]
+            current = [table[position] for position in current]
+
+        lifts = [array("i", current)]
+        hits = [bytearray([hit >= 0 for hit in first_hit])]
+
+        # binary lifting: 2 ** (k + 1) passes are two runs of 2 ** k passes
+        for _ in range(1, levels):
+            lift, hit = lifts[-1], hits[-1]
+            lifts.append(array("i", [lift[lift[node]] for node in range(n)]))
+            hits.append(bytearray([hit[node] or hit[lift[node]] for node in range(n)]))
+
+        return JumpTable(lifts=lifts, hits=hits, first_hit=first_hit)
+
+    def steps_to(self, start: int, targets: bytearray, jumps: JumpTable = None) -> int:
+        if jumps is not None:
+            return self.jump_to(start, jumps)
+
+        tables = (self.left, self.right)
+        directions = self.directions
+        period = len(directions)
+
+        node = start
+        i = j = 0
+        while not targets[node]:
+            node = tables[directions[j]][node]
+            i += 1
+            j += 1
+            if j == period:
+                j = 0
+        return i
+
+    def jump_to(self, start: int, jumps: JumpTable) -> int:
+        # skip the largest number of whole passes that never hit a target
+        node = start
+        passes = 0
+        for k in reversed(range(len(jumps.lifts))):
+            if not jumps.hits[k][node]:
+                node = jumps.lifts[k][node]
+                passes += 1 << k
+
+        if jumps.first_hit[node] < 0:
+            raise ValueError(f"{self.names[start]} reaches no target")
+
+        return passes * len(self.directions) + jumps.first_hit[node]
+
+    def analyse(self, start: int, targets: bytearray) -> Cycle:
+        # the walk is deterministic in (node, direction index), so it cycles
+        # as soon as one of those states comes round again
+        tables = (self.left, self.right)
+        directions = self.directions
+        period = len(directions)
+
+        seen = dict()
+        hits = list()
+        node = start
+        step = j = 0
+        while (state := node * period + j) not in seen:
+            seen[state] = step
+            if targets[node]:
+                hits.append(step)
+            node = tables[directions[j]][node]
+            step += 1
+            j += 1
+            if j == period:
+                j = 0
+
+        offset = seen[state]
+        return Cycle(offset=offset, length=step - offset, hits=hits)
+
+
+@dataclass
+class Cycle:
+    # step at which the walk enters its cycle
+    offset: int
+    # number of steps round the cycle
+    length: int
+    # steps before offset + length that land on a target; those from offset
+    # onwards repeat every length steps
+    hits: list[int]
+    # the same steps as a set, for membership tests
+    hit_set: frozenset[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.hit_set = frozenset(self.hits)
+
+    def is_hit(self, step: int) -> bool:
+        if step < self.offset:
+            return step in self.hit_set
+        residue = (step - self.offset) % self.length + self.offset
+        return residue in self.hit_set
+
+
+def crt(a: int, m: int, b: int, n: int) -> tuple[int, int] | None:
+    # generalised CRT: x = a (mod m) and x = b (mod n), with m and n not
+    # necessarily coprime
+    g = math.gcd(m, n)
+    if (b - a) % g:
+        return None
+
+    lcm = m // g * n
+    k = (b - a) // g * pow(m // g, -1, n // g) % (n // g)
+    return (a + m * k) % lcm, lcm
+
+
+def first_common_hit(cycles: list[Cycle]) -> int:
+    # every cycle has been entered after this many steps
+    settled = max(cycle.offset for cycle in cycles)
+
+    # any earlier answer must be a pre-cycle hit of the slowest walk
+    early = sorted({hit for cycle in cycles for hit in cycle.hits if hit < settled})
+    for step in early:
+        if all(cycle.is_hit(step) for cycle in cycles):
+            return step
+
+    # after that each walk contributes one congruence per hit in its cycle
+    residues, modulus = {0}, 1
+    for cycle in cycles:
+        next_residues = set()
+        next_modulus = modulus
+        for hit in cycle.hits:
+            if hit < cycle.offset:
+                continue
+            for residue in residues:
+                if (solution := crt(residue, modulus, hit, cycle.length)) is not None:
+                    x, next_modulus = solution
+                    next_residues.add(x)
+        residues, modulus = next_residues, next_modulus
+        logger.debug(f"{len(residues)} residues mod {modulus}")
+
+    if not residues:
+        raise ValueError("walks never reach their targets together")
+
+    # smallest step at or after settled for each residue
+    return min(x - (x - settled) // modulus * modulus for x in residues)
+
+
+@dataclass
+class JumpTable:
+    # node reached after 2 ** k full passes of the directions
+    lifts: list[array]
+    # whether a target is hit during those 2 ** k passes
+    hits: list[bytearray]
+    # step within a single pass of the first target hit, or -1
+    first_hit: array
+
 
 RE_NODE = re.compile(r"[A-Z]{3}")
 
@@ -52,41 +241,62 @@ def parse_input(lines: Iterable[str]) -> Instructions:
     return instructions
 
 
-def part_one(lines: Iterable[str]) -> int:
-    instructions = parse_input(lines)
-    node = instructions.nodes["AAA"]
+def steps_to_zzz(network: Network, jumps: bool = False) -> int:
+    targets = bytearray(len(network.names))
+    targets[network.ids["ZZZ"]] = 1
+
+    # the jump table only pays for itself on walks of many passes
+    table = network.jump_table(targets) if jumps else None
+    return network.steps_to(network.ids["AAA"], targets, table)
+
+
+def part_one(lines: Iterable[str], jumps: bool = False) -> int:
+    return steps_to_zzz(parse_input(lines).compile(), jumps)
+
+
+def detect_loop(start: int, network: Network, jumps: JumpTable = None) -> int:
+    return network.steps_to(start, network.targets("Z"), jumps)
+
+
+# each worker process holds one read-only copy of the network, set once by
+# the pool initializer rather than shipped with every task
+_worker_network: Network = None
+_worker_targets: bytearray = None
+
+
+def _init_worker(network: Network, targets: bytearray) -> None:
+    global _worker_network, _worker_targets
+    _worker_network = network
+    _worker_targets = targets
+
+
+def _analyse(start: int) -> Cycle:
+    return _worker_network.analyse(start, _worker_targets)
 
-    i = 0
-    while node != instructions.nodes["ZZZ"]:
-        direction = instructions.directions[i % len(instructions.directions)]
-        if direction == "R":
-            node = node.right
-        if direction == "L":
-            node = node.left
-        i += 1
 
-    return i
+def ghost_steps(network: Network, workers: int = None) -> int:
+    start_nodes = [i for i, name in enumerate(network.names) if name.endswith("A")]
 
+    targets = network.targets("Z")
+    if workers:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(network, targets),
+        ) as pool:
+            cycles = list(pool.map(_analyse, start_nodes))
+    else:
+        cycles = [network.analyse(node, targets) for node in start_nodes]
+    logger.debug(cycles)
 
-def detect_loop(node: Node, instructions: Instructions) -> int:
-    i = 0
-    while not (node.name.endswith("Z")):
-        direction = instructions.directions[i % len(instructions.directions)]
-        if direction == "R":
-            node = node.right
-        if direction == "L":
-            node = node.left
-        i += 1
-    return i
+    return first_common_hit(cycles)
 
 
-def part_two(lines: Iterable[str]) -> int:
-    instructions = parse_input(lines)
-    start_nodes = [
-        node for name, node in instructions.nodes.items() if name.endswith("A")
-    ]
-    loops = [detect_loop(node, instructions) for node in start_nodes]
-    logger.debug(loops)
+def part_two(lines: Iterable[str], workers: int = None) -> int:
+    return ghost_steps(parse_input(lines).compile(), workers)
 
 
-    return math.lcm(*loops)
+def solve(lines: Iterable[str], workers: int = None) -> tuple[int, int]:
+    # both parts from one parse and compile of the network
+    network = parse_input(lines).compile()
+    return steps_to_zzz(network), ghost_steps(network, workers)
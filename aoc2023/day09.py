@@ -1,6 +1,13 @@
+from functools import cache
 import logging
+import math
 from typing import Iterable
 
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional extra
+    np = None
+
 logger = logging.getLogger()
 
 
@@ -33,16 +40,59 @@ def predict_next(histories: list[History]) -> int:
     return out[-1]
 
 
-def part_one(lines: Iterable[str]) -> int:
-    histories = parse_input(lines)
-    out = 0
-    for history in histories:
-        diffs = diff_history([history])
-        result = predict_next(diffs)
+@cache
+def next_weights(n: int) -> tuple[int, ...]:
+    # extending the n-th differences by a zero gives the next value as an
+    # alternating binomial sum over the history
+    return tuple((-1) ** (n - 1 - i) * math.comb(n, i) for i in range(n))
+
+
+@cache
+def previous_weights(n: int) -> tuple[int, ...]:
+    return tuple((-1) ** i * math.comb(n, i + 1) for i in range(n))
+
+
+def extrapolate_next(history: History) -> int:
+    return sum(w * x for w, x in zip(next_weights(len(history)), history))
+
+
+def extrapolate_previous(history: History) -> int:
+    return sum(w * x for w, x in zip(previous_weights(len(history)), history))
+
+
+INT64_MAX = 2**63 - 1
 
-        out += result
 
-    return out
+def sum_extrapolated(histories: list[History], backwards: bool = False) -> int:
+    weights_for = previous_weights if backwards else next_weights
+    lengths = {len(history) for history in histories}
+
+    # equal-length histories go through numpy as one matrix-vector product,
+    # as long as no row can overflow int64
+    if np is not None and len(lengths) == 1:
+        (n,) = lengths
+        try:
+            matrix = np.array(histories, dtype=np.int64)
+        except OverflowError:
+            matrix = None
+
+        # the weights' absolute values sum to 2 ** n - 1, and the weights
+        # themselves have to fit in int64 even when every value is 0
+        if matrix is not None and matrix.size:
+            largest = max(int(np.abs(matrix).max()), 1)
+            if largest * (2**n - 1) <= INT64_MAX:
+                weights = np.array(weights_for(n), dtype=np.int64)
+                return sum((matrix @ weights).tolist())
+
+    extrapolate = extrapolate_previous if backwards else extrapolate_next
+    return sum(extrapolate(history) for history in histories)
+
+
+def part_one(lines: Iterable[str], batch: bool = False) -> int:
+    if batch:
+        return sum_extrapolated(list(parse_input(lines)))
+
+    return sum(extrapolate_next(history) for history in parse_input(lines))
 
 
 def predict_previous(histories: list[History]) -> int:
@@ -55,13 +105,23 @@ def predict_previous(histories: list[History]) -> int:
     return out[-1]
 
 
-def part_two(lines: Iterable[str]) -> int:
-    histories = parse_input(lines)
-    out = 0
-    for history in histories:
-        diffs = diff_history([history])
-        result = predict_previous(diffs)
+def part_two(lines: Iterable[str], batch: bool = False) -> int:
+    if batch:
+        return sum_extrapolated(list(parse_input(lines)), backwards=True)
+
+    return sum(extrapolate_previous(history) for history in parse_input(lines))
+
+
+def solve(lines: Iterable[str], batch: bool = False) -> tuple[int, int]:
+    # both parts from a single pass over the input
+    if batch:
+        histories = list(parse_input(lines))
+        forward = sum_extrapolated(histories)
+        return forward, sum_extrapolated(histories, backwards=True)
 
-        out += result
+    forward = backward = 0
+    for history in parse_input(lines):
+        forward += extrapolate_next(history)
+        backward += extrapolate_previous(history)
 
-    return out
+    return forward, backward
@@ -6,8 +6,11 @@ from aoc2023.day01 import (
     get_calibration_advanced,
     get_calibration_value,
     get_first_and_last,
+    get_first_and_last_reversed,
     part_one,
+    part_one_file,
     part_two,
+    solve,
 )
 
 
@@ -45,6 +48,15 @@ def test_part_one_sample(sample_part_one: list[str]):
     assert part_one(sample_part_one) == 142
 
 
+def test_part_one_file(sample_part_one: list[str], tmp_path):
+    fp = tmp_path / "calibration.txt"
+    fp.write_text("\n".join(sample_part_one * 50))
+
+    expected = part_one(sample_part_one * 50)
+    assert part_one_file(fp) == expected
+    assert part_one_file(fp, chunk_size=7) == expected
+
+
 def test_part_one(test_data: str):
     assert part_one(test_data) == 53080
 
@@ -67,6 +79,12 @@ def test_get_first_and_last():
     assert get_first_and_last("zoneight234") == ("1", "4")
 
 
+def test_get_first_and_last_matches_reversed(sample_part_two: list[str]):
+    keys = sample_part_two + ["oneight", "twone7eightwo", "sevenine", "ninine", "5"]
+    for key in keys:
+        assert get_first_and_last(key) == get_first_and_last_reversed(key)
+
+
 def test_get_calibration_advanced(sample_part_two: list[str]):
     expected = [29, 83, 13, 24, 42, 14, 76]
     for key, value in zip(sample_part_two, expected):
@@ -83,3 +101,7 @@ def test_part_two_overlapping():
 
 def test_part_two(test_data: str):
     assert part_two(test_data) == 53268
+
+
+def test_solve(sample_part_one: list[str]):
+    assert solve(sample_part_one) == (142, 142)
@@ -1,6 +1,17 @@
 import pytest
-from aoc2023 import read_lines
-from aoc2023.day02 import Cubes, Game, is_valid_game, parse_game, part_one, part_two
+from aoc2023 import day02, read_lines
+from aoc2023.day02 import (
+    Cubes,
+    Game,
+    GameTable,
+    get_min_cubes,
+    is_valid_game,
+    parse_game,
+    part_one,
+    part_two,
+    scan_game,
+    solve,
+)
 
 
 def test_parse_game():
@@ -44,6 +55,25 @@ def test_is_valid_game(sample_part_one):
         assert is_valid_game(bag, game) is as_expected
 
 
+def test_scan_game(sample_part_one):
+    assert scan_game(sample_part_one[0]) == (1, 4, 2, 6)
+    assert scan_game(sample_part_one[2]) == (3, 20, 13, 6)
+
+    for game_str in sample_part_one:
+        game = parse_game(game_str)
+        min_cubes = get_min_cubes(game)
+        assert scan_game(game_str) == (
+            game.number,
+            min_cubes["red"],
+            min_cubes["green"],
+            min_cubes["blue"],
+        )
+
+
+def test_part_two_sample(sample_part_one):
+    assert part_two(sample_part_one) == 2286
+
+
 @pytest.fixture
 def test_data():
     return read_lines("data/day02.txt")
@@ -55,4 +85,62 @@ def test_part_one(test_data):
 
 
 def test_part_two(test_data):
-    assert part_two(test_data) == 65122
\ No newline at end of file
+    assert part_two(test_data) == 65122
+
+
+def test_solve(sample_part_one):
+    bag: Cubes = {"red": 12, "green": 13, "blue": 14}
+    assert solve(bag, sample_part_one) == (8, 2286)
+
+
+def test_game_table(sample_part_one):
+    table = GameTable.from_lines(sample_part_one)
+    assert len(table) == 5
+
+    for cubes in [
+        {"red": 12, "green": 13, "blue": 14},
+        {"red": 4, "green": 3, "blue": 6},
+        {"green": 20},
+        {},
+    ]:
+        assert table.feasible(cubes) == part_one(cubes, sample_part_one)
+
+
+def test_game_table_without_numpy(sample_part_one, monkeypatch):
+    monkeypatch.setattr(day02, "np", None)
+    table = GameTable.from_lines(sample_part_one)
+    assert table.feasible({"red": 12, "green": 13, "blue": 14}) == 8
+
+
+def test_game_table_cache(sample_part_one, tmp_path):
+    fp = tmp_path / "games.txt"
+    fp.write_text("\n".join(sample_part_one))
+
+    table = GameTable.from_file(fp)
+    assert (tmp_path / "games.txt.table").exists()
+
+    cached = GameTable.from_file(fp)
+    assert cached == table
+    assert cached.feasible({"red": 12, "green": 13, "blue": 14}) == 8
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "games.txt",
+        "games.txt.table",
+    ]
+
+
+def test_game_table_corrupt_cache(sample_part_one, tmp_path):
+    fp = tmp_path / "games.txt"
+    fp.write_text("\n".join(sample_part_one))
+    table = GameTable.from_file(fp)
+
+    # a truncated cache, still newer than the log, is rebuilt from the log
+    cache_fp = tmp_path / "games.txt.table"
+    cache_fp.write_bytes(cache_fp.read_bytes()[:-3])
+    with pytest.raises(ValueError):
+        GameTable.load(cache_fp)
+
+    assert GameTable.from_file(fp) == table
+    assert GameTable.load(cache_fp) == table
+
+    cache_fp.write_bytes(b"")
+    assert GameTable.from_file(fp) == table
@@ -2,7 +2,15 @@ import logging
 import pytest
 
 from aoc2023 import read_lines
-from aoc2023.day03 import Coord, EngineBlock, part_one, part_two
+from aoc2023.day03 import (
+    Coord,
+    EngineBlock,
+    SchematicRow,
+    part_one,
+    part_two,
+    solve,
+    solve_streaming,
+)
 
 logger = logging.getLogger()
 
@@ -36,11 +44,58 @@ def test_engine_block(sample_data):
     assert engine[Coord(1, 0)].value == 467
 
     assert engine[Coord(0, 0)] is engine[Coord(1, 0)]
+    assert engine[Coord(0, 0)].span == (0, 0, 3)
+    assert engine[Coord(0, 0)].coords == [Coord(0, 0), Coord(1, 0), Coord(2, 0)]
 
     assert Coord(3, 1) in engine.symbols
     assert engine[Coord(3, 1)] == "*"
 
 
+def test_engine_grid(sample_data):
+    engine = EngineBlock()
+    engine.load_block(sample_data)
+
+    assert (engine.width, engine.height) == (10, 10)
+    assert len(engine.parts) == 10
+    assert engine.part_ids[0] == engine.part_ids[2] >= 0
+    assert engine.part_ids[3] == -1
+
+    assert sorted(engine.neighbours(0)) == [1, 10, 11]
+    assert sorted(engine.neighbours(13)) == [2, 3, 4, 12, 14, 22, 23, 24]
+    assert {engine.parts[i].value for i in engine.part_ids_near(13)} == {467, 35}
+
+
+def test_engine_grid_ragged():
+    engine = EngineBlock()
+    engine.load_block(iter(["12", "*..45", "7"]))
+
+    assert (engine.width, engine.height) == (5, 3)
+    assert engine.grid == bytearray(b"12...*..457....")
+    assert [part.value for part in engine.parts] == [12, 45, 7]
+
+
+def test_engine_grid_non_ascii():
+    with pytest.raises(ValueError, match="non-ASCII"):
+        part_one(["1\u00e92", "3.."])
+    with pytest.raises(ValueError, match="non-ASCII"):
+        part_one(["1\u00e92", "3.."], streaming=True)
+
+
+def test_gears(sample_data):
+    engine = EngineBlock()
+    engine.load_block(sample_data)
+
+    assert sorted(engine.symbol_cells) == ["#", "$", "*", "+"]
+    assert len(engine.symbol_cells["*"]) == 3
+
+    gears = [tuple(n.value for n in gear) for gear in engine.gears()]
+    assert sorted(gears) == [(467, 35), (755, 598)]
+
+    assert [n.value for (n,) in engine.gears("*", 1)] == [617]
+    assert [n.value for (n,) in engine.gears("#", 1)] == [633]
+    assert list(engine.gears("@")) == []
+
+
 def test_part_one_sample(sample_data):
     assert part_one(sample_data) == 4361
 
@@ -55,3 +110,28 @@ def test_part_two_sample(sample_data):
 
 def test_part_two_sample(test_data):
     assert part_two(test_data) == 78915902
+
+
+def test_solve(sample_data):
+    assert solve(sample_data) == (4361, 467835)
+
+
+def test_schematic_row():
+    row = SchematicRow.from_line("617*..$.58")
+    assert row.numbers == [(0, 3, 617), (8, 10, 58)]
+    assert row.symbols == [3, 6]
+    assert row.gears == [3]
+
+    assert row.has_symbol(2, 4)
+    assert not row.has_symbol(7, 10)
+    assert list(row.numbers_touching(3)) == [617]
+    assert list(row.numbers_touching(4)) == []
+
+
+def test_solve_streaming(sample_data):
+    # lines as read from stdin, newlines and all
+    lines = (line + "\n" for line in sample_data)
+    assert solve_streaming(lines) == (4361, 467835)
+
+    assert part_one(iter(sample_data), streaming=True) == 4361
+    assert part_two(iter(sample_data), streaming=True) == 467835
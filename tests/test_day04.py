@@ -1,6 +1,6 @@
 import pytest
 from aoc2023 import read_lines
-from aoc2023.day04 import ScratchCard, part_one, part_two
+from aoc2023.day04 import ScratchCard, part_one, part_two, part_two_recursive, solve
 
 
 def test_scratch_card():
@@ -13,6 +13,14 @@ def test_scratch_card():
     assert card.calculate_points() == 8
 
 
+def test_scratch_card_masks():
+    card = ScratchCard.from_line("Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53")
+
+    assert card.winners_mask == sum(1 << n for n in [41, 48, 83, 86, 17])
+    assert card.matches == 4
+    assert not hasattr(card, "__dict__")
+
+
 @pytest.fixture
 def sample_data():
     return [
@@ -44,3 +52,19 @@ def test_part_two_sample(sample_data):
 
 def test_part_two(test_data):
     assert part_two(test_data) == 6189740
+
+
+def test_part_two_matches_recursive(sample_data):
+    assert part_two(sample_data) == part_two_recursive(sample_data)
+
+
+def test_count_cards_cascade():
+    # every card wins the next two, so copies follow the fibonacci sequence
+    lines = [f"Card {i}: 1 2 | 1 2" for i in range(1, 21)]
+    lines[-2] = "Card 19: 1 2 | 1 3"
+    lines[-1] = "Card 20: 1 2 | 3 4"
+    assert part_two(lines) == part_two_recursive(lines)
+
+
+def test_solve(sample_data):
+    assert solve(sample_data) == (13, 30)
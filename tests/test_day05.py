@@ -1,15 +1,20 @@
 import logging
 import pytest
-from aoc2023 import read_lines
+from aoc2023 import day05, read_lines
 from aoc2023.day05 import (
     Connector,
+    FarmMap,
     Span,
+    SpanConnector,
+    SpanMap,
+    merge_spans,
     SpanAlmanac,
     parse_input,
     parse_span_input,
     parse_span_seeds,
     part_one,
     part_two,
+    solve,
 )
 
 logger = logging.getLogger()
@@ -32,6 +37,27 @@ def test_range_connector():
         assert connector.map(value) == expected
 
 
+def test_farm_map():
+    farm_map = FarmMap(connectors=[Connector(98, 50, 2), Connector(50, 52, 48)])
+
+    assert farm_map.map(10) == 10
+    assert farm_map.map(50) == 52
+    assert farm_map.map(97) == 99
+    assert farm_map.map(98) == 50
+    assert farm_map.map(100) == 100
+
+
+def test_farm_map_many():
+    # built directly, not by the parser, so the constructor has to index it
+    farm_map = FarmMap(connectors=[Connector(98, 50, 2), Connector(50, 52, 48)])
+    values = [10, 50, 60, 98, 100]
+    expected = [10, 52, 62, 50, 100]
+
+    assert farm_map.map_many(values) == expected
+    if day05.np is not None:
+        assert list(farm_map.map_many(day05.np.array(values))) == expected
+
+
 @pytest.fixture
 def sample_data():
     return [
@@ -85,6 +111,21 @@ def test_almanac(sample_data):
     assert almanac.map(13) == 35
 
 
+def test_almanac_map_many(sample_data):
+    almanac = parse_input(sample_data)
+    seeds = list(range(0, 200))
+    expected = [almanac.map(seed) for seed in seeds]
+
+    assert list(almanac.map_many(seeds)) == expected
+
+
+def test_almanac_map_many_without_numpy(sample_data, monkeypatch):
+    monkeypatch.setattr(day05, "np", None)
+    almanac = parse_input(sample_data)
+
+    assert almanac.map_many([79, 14, 55, 13]) == [82, 43, 86, 35]
+
+
 def test_part_one_sample(sample_data):
     assert part_one(sample_data) == 35
 
@@ -110,6 +151,33 @@ def test_parse_span_seeds():
     assert parse_span_seeds(seeds) == [Span(79, 92), Span(55, 67)]
 
 
+def test_span_map():
+    span_map = SpanMap(
+        connectors=[
+            SpanConnector(Span(98, 99), Span(50, 51)),
+            SpanConnector(Span(50, 97), Span(52, 99)),
+        ]
+    )
+
+    assert span_map.map(Span(0, 10)) == [Span(0, 10)]
+    assert span_map.map(Span(60, 70)) == [Span(62, 72)]
+    assert span_map.map(Span(40, 120)) == [
+        Span(40, 49),
+        Span(52, 99),
+        Span(50, 51),
+        Span(100, 120),
+    ]
+
+
+def test_span_almanac_matches_almanac(sample_data):
+    almanac = parse_input(sample_data)
+    span_almanac = parse_span_input(sample_data)
+
+    for seed in range(0, 110):
+        (location,) = span_almanac.map([Span(seed, seed)])
+        assert location == Span(almanac.map(seed), almanac.map(seed))
+
+
 def test_parse_span_input(sample_data):
     almanac = parse_span_input(sample_data)
     assert isinstance(almanac, SpanAlmanac)
@@ -123,5 +191,44 @@ def test_part_two_sample(sample_data):
 
 
 def test_part_two(test_data):
-    # This is the correct answer, but my current implementation is off by one
     assert part_two(test_data) == 99751240
+
+
+def test_compose(sample_data):
+    almanac = parse_input(sample_data)
+    seed_to_location = almanac.compose()
+
+    assert seed_to_location.name == "seed-to-location"
+    for seed in range(0, 200):
+        assert seed_to_location.map(seed) == almanac.map(seed)
+
+
+def test_compose_spans(sample_data):
+    span_almanac = parse_span_input(sample_data)
+    seed_to_location = span_almanac.compose()
+
+    for seed in span_almanac.seeds:
+        expected = span_almanac.map([seed])
+        assert merge_spans(seed_to_location.map(seed)) == expected
+
+
+def test_merge_spans():
+    assert merge_spans([]) == []
+    assert merge_spans([Span(5, 9), Span(0, 3)]) == [Span(0, 3), Span(5, 9)]
+    assert merge_spans([Span(5, 9), Span(0, 4)]) == [Span(0, 9)]
+    assert merge_spans([Span(0, 9), Span(2, 4), Span(8, 12)]) == [Span(0, 12)]
+
+
+def test_span_almanac_stats(sample_data):
+    almanac = parse_span_input(sample_data)
+    stages = list()
+
+    almanac.map(almanac.seeds, stats=lambda *args: stages.append(args))
+
+    assert [name for name, _, _ in stages] == [m.name for m in almanac.maps]
+    for _, fragments, merged in stages:
+        assert merged <= fragments
+
+
+def test_solve(sample_data):
+    assert solve(sample_data) == (35, 46)
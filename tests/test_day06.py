@@ -6,6 +6,7 @@ from aoc2023.day06 import (
     parse_input_kerning,
     part_one,
     part_two,
+    solve,
 )
 
 
@@ -22,6 +23,21 @@ def test_parse_input():
 
 def test_n_winners():
     assert n_winners(7, 9) == 4
+    assert n_winners(15, 40) == 8
+    assert n_winners(30, 200) == 9
+    assert n_winners(71530, 940200) == 71503
+
+
+def test_n_winners_brute_force():
+    for time in range(0, 60):
+        for record in range(0, time * time // 4 + 2):
+            assert n_winners(time, record) == n_winners(time, record, brute_force=True)
+
+
+def test_n_winners_large():
+    time = 10**15
+    record = (time // 2) * (time - time // 2) - 1
+    assert n_winners(time, record) == 1
 
 
 @pytest.fixture
@@ -46,3 +62,11 @@ def test_parse_input_kerning():
 
 def test_part_two(test_data):
     assert part_two(test_data) == 46173809
+
+
+def test_solve():
+    lines = [
+        "Time:      7  15   30",
+        "Distance:  9  40  200",
+    ]
+    assert solve(iter(lines)) == (288, 71503)
@@ -1,8 +1,21 @@
 from collections import Counter
+from itertools import combinations_with_replacement
 import logging
 import pytest
 from aoc2023 import read_lines
-from aoc2023.day07 import Card, Hand, HandType, parse_input, part_one, part_two
+from aoc2023.day07 import (
+    Card,
+    Hand,
+    HandType,
+    encode_hand,
+    hand_index,
+    hand_type_table,
+    parse_input,
+    part_one,
+    part_two,
+    solve,
+    total_winnings_streaming,
+)
 
 logger = logging.getLogger()
 
@@ -42,6 +55,25 @@ def test_hand():
     assert fives <= fives
 
 
+def test_hand_key():
+    fives = Hand(cards=[Card.ACE] * 5)
+    fours = Hand(cards=[Card.ACE] * 4 + [Card.QUEEN])
+    low_fours = Hand(cards=[Card.X2] + [Card.ACE] * 4)
+
+    assert fives.key > fours.key > low_fours.key
+    assert fours.key == (6 << 20) | 0xEEEEC
+
+
+@pytest.mark.parametrize("jokers", [False, True])
+def test_hand_type_table(jokers):
+    # both classifiers ignore card order, so every multiset covers every hand
+    table = hand_type_table(jokers)
+    for cards in combinations_with_replacement(list(Card), 5):
+        hand = Hand(cards=list(cards), jokers=jokers)
+        index = hand_index([card.rank - 1 for card in cards])
+        assert table[index] == hand.infer_hand_type_counter().value
+
+
 def test_parse_input(sample_data):
     hands = parse_input(sample_data)
     assert len(hands) == 5
@@ -91,5 +123,50 @@ def test_part_two_sample(sample_data):
     assert part_two(sample_data) == 5905
 
 
+def test_encode_hand(sample_data):
+    for jokers in (False, True):
+        hands = parse_input(sample_data, jokers=jokers)
+        for line, hand in zip(sample_data, hands):
+            assert encode_hand(line.split()[0], jokers=jokers) == hand.key
+
+
+def test_streaming(sample_data):
+    assert part_one(sample_data, streaming=True) == 6440
+    assert part_two(sample_data, streaming=True) == 5905
+
+
+def test_streaming_spills_runs():
+    ranks = "23456789TJQKA"
+    lines = [
+        f"{ranks[i % 13]}{ranks[i * 7 % 13]}{ranks[i * 3 % 13]}J{ranks[i % 5]} {i + 1}"
+        for i in range(500)
+    ]
+
+    assert total_winnings_streaming(lines, chunk_size=37) == part_one(lines)
+    assert total_winnings_streaming(lines, jokers=True, chunk_size=37) == part_two(
+        lines
+    )
+
+
+def test_streaming_merges_in_passes():
+    ranks = "23456789TJQKA"
+    lines = [
+        f"{ranks[i % 13]}{ranks[i * 5 % 13]}{ranks[i * 11 % 13]}{ranks[i % 7]}J {i}"
+        for i in range(300)
+    ]
+
+    # 30 spilled runs with a fan-in of 3 needs several merge passes
+    assert total_winnings_streaming(lines, chunk_size=10, max_fan_in=3) == part_one(
+        lines
+    )
+    assert total_winnings_streaming(
+        lines, jokers=True, chunk_size=10, max_fan_in=3
+    ) == part_two(lines)
+
+
 def test_part_two(test_data):
     assert part_two(test_data) == 251421071
+
+
+def test_solve(sample_data):
+    assert solve(iter(sample_data)) == (6440, 5905)
@@ -2,7 +2,16 @@ import logging
 
 import pytest
 from aoc2023 import read_lines
-from aoc2023.day08 import RE_NODE, RE_NODE, parse_input, part_one, part_two
+from aoc2023.day08 import (
+    RE_NODE,
+    Cycle,
+    crt,
+    first_common_hit,
+    parse_input,
+    part_one,
+    part_two,
+    solve,
+)
 
 logger = logging.getLogger()
 
@@ -42,6 +51,58 @@ def test_instructions(sample_data):
     assert AAA.right.left == instructions.nodes["ZZZ"]
 
 
+def test_compile(sample_data):
+    network = parse_input(sample_data).compile()
+    assert network.directions == bytes([1, 0])
+
+    AAA = network.ids["AAA"]
+    assert network.names[network.left[AAA]] == "BBB"
+    assert network.names[network.right[AAA]] == "CCC"
+
+
+def test_jump_table():
+    lines = [
+        "LLR",
+        "",
+        "AAA = (BBB, BBB)",
+        "BBB = (AAA, ZZZ)",
+        "ZZZ = (ZZZ, ZZZ)",
+    ]
+    network = parse_input(lines).compile()
+    targets = network.targets("Z")
+    jumps = network.jump_table(targets, levels=4)
+
+    for name in network.names:
+        start = network.ids[name]
+        assert network.steps_to(start, targets, jumps) == network.steps_to(
+            start, targets
+        )
+
+
+def test_jump_table_clamps_levels():
+    lines = [
+        "L",
+        "",
+        "AAA = (BBB, BBB)",
+        "BBB = (CCC, CCC)",
+        "CCC = (ZZZ, ZZZ)",
+        "ZZZ = (ZZZ, ZZZ)",
+    ]
+    network = parse_input(lines).compile()
+    targets = network.targets("Z")
+    jumps = network.jump_table(targets, levels=1)
+
+    assert network.steps_to(network.ids["AAA"], targets, jumps) == 3
+
+
+def test_jump_table_unreachable(sample_data):
+    network = parse_input(sample_data).compile()
+    jumps = network.jump_table(network.targets("Z"))
+
+    with pytest.raises(ValueError):
+        network.steps_to(network.ids["DDD"], network.targets("Z"), jumps)
+
+
 def test_part_one_sample(sample_data):
     assert part_one(sample_data) == 2
 
@@ -54,6 +115,7 @@ def test_part_one_sample(sample_data):
     ]
 
     assert part_one(another_example) == 6
+    assert part_one(another_example, jumps=True) == 6
 
 
 @pytest.fixture
@@ -83,3 +145,44 @@ def test_part_two_sample():
 
 def test_part_two_sample(test_data):
     assert part_two(test_data) == 13334102464297
+
+
+def test_crt():
+    assert crt(2, 3, 3, 5) == (8, 15)
+    assert crt(1, 4, 3, 6) == (9, 12)
+    assert crt(1, 4, 2, 6) is None
+
+
+def test_part_two_offset_cycles():
+    # AAA hits Z at 1, 4, 7, ... and EEA at 2, 4, 6, ...: the lcm of the
+    # first hits would be 2
+    lines = [
+        "L",
+        "",
+        "AAA = (BBZ, BBZ)",
+        "BBZ = (CCC, CCC)",
+        "CCC = (DDD, DDD)",
+        "DDD = (BBZ, BBZ)",
+        "EEA = (GGG, GGG)",
+        "GGG = (HHZ, HHZ)",
+        "HHZ = (GGG, GGG)",
+    ]
+    network = parse_input(lines).compile()
+    cycle = network.analyse(network.ids["AAA"], network.targets("Z"))
+    assert cycle == Cycle(offset=1, length=3, hits=[1])
+
+    assert part_two(lines) == 4
+    assert part_two(lines, workers=2) == 4
+
+
+def test_first_common_hit():
+    # hits before a walk settles into its cycle count too
+    early = Cycle(offset=5, length=2, hits=[3, 6])
+    steady = Cycle(offset=0, length=3, hits=[0])
+    assert first_common_hit([early, steady]) == 3
+
+    assert first_common_hit([Cycle(2, 4, [3]), Cycle(0, 6, [1])]) == 7
+
+
+def test_solve(sample_data):
+    assert solve(iter(sample_data)) == (2, 2)
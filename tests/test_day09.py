@@ -1,8 +1,19 @@
 import logging
 
 import pytest
-from aoc2023 import read_lines
-from aoc2023.day09 import diff_history, parse_input, part_one, part_two, predict_next
+from aoc2023 import day09, read_lines
+from aoc2023.day09 import (
+    diff_history,
+    extrapolate_next,
+    extrapolate_previous,
+    parse_input,
+    part_one,
+    part_two,
+    predict_next,
+    predict_previous,
+    solve,
+    sum_extrapolated,
+)
 
 
 logger = logging.getLogger()
@@ -46,6 +57,52 @@ def test_predict_next():
         assert result == expected
 
 
+def test_extrapolate():
+    data = [
+        "0 3 6 9 12 15",
+        "1 3 6 10 15 21",
+        "10 13 16 21 30 45",
+        "-4 1 0 -1 4 21 56 115",
+    ]
+
+    for history in parse_input(data):
+        diffs = diff_history([list(history)])
+        assert extrapolate_next(history) == predict_next(diffs)
+        assert extrapolate_previous(history) == predict_previous(diffs)
+
+    assert part_one(data[:3]) == 114
+    assert part_two(data[:3]) == 2
+
+
+def test_batch():
+    data = [
+        "0 3 6 9 12 15",
+        "1 3 6 10 15 21",
+        "10 13 16 21 30 45",
+    ]
+    assert part_one(data, batch=True) == 114
+    assert part_two(data, batch=True) == 2
+
+
+def test_batch_overflow():
+    # large values fall back to exact python ints
+    histories = [[10**17 * x**3 for x in range(20)], [x for x in range(20)]]
+    expected = sum(extrapolate_next(history) for history in histories)
+    assert sum_extrapolated(histories) == expected
+
+
+def test_batch_long_zero_histories():
+    # too long for int64 weights, so this has to fall back to plain ints
+    assert sum_extrapolated([[0] * 70] * 2) == 0
+    assert sum_extrapolated([[0] * 70] * 2, backwards=True) == 0
+
+
+def test_batch_without_numpy(monkeypatch):
+    monkeypatch.setattr(day09, "np", None)
+    histories = [[0, 3, 6, 9, 12, 15], [1, 3, 6, 10, 15, 21]]
+    assert sum_extrapolated(histories, backwards=True) == -3 + 0
+
+
 @pytest.fixture
 def test_data():
     return read_lines("data/day09.txt")
@@ -57,3 +114,13 @@ def test_part_one(test_data):
 
 def test_part_two(test_data):
     assert part_two(test_data) == 2101499000
+
+
+def test_solve():
+    data = [
+        "0 3 6 9 12 15",
+        "1 3 6 10 15 21",
+        "10 13 16 21 30 45",
+    ]
+    assert solve(iter(data)) == (114, 2)
+    assert solve(iter(data), batch=True) == (114, 2)